@@ -13,16 +13,23 @@ Author: AI Assistant
 License: MIT
 """
 
+import asyncio
 import os
+import re
+import shutil
+import signal
+import subprocess
 import time
 import random
 import logging
 import json
+from collections import OrderedDict
 from datetime import datetime
 from typing import Optional, Tuple, List, Dict, Any
 
 import chess
 import chess.engine
+import chess.polyglot
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
@@ -31,22 +38,432 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+# Cache of resolved ChromeDriver binaries keyed by Chrome major version
+DRIVER_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "chess_bot", "driver.json")
+
+# Best moves found by the engine, keyed by position and search time
+MOVE_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "chess_bot", "moves.json")
+MOVE_CACHE_SIZE = 50000
+
+# LRU of engine results shared by every bot, so parallel games add to one
+# cache instead of overwriting each other's: (position key, time limit) -> UCI move
+_MOVE_CACHE: "OrderedDict[Tuple, str]" = OrderedDict()
+_MOVE_CACHE_LOADED = False
+
+def _write_json_atomic(path: str, data: Any, indent: Optional[int] = None) -> None:
+    """Write JSON to a temp file and rename it over path, so a kill mid-write keeps the old file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=indent)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def _pos_key(board: chess.Board) -> Tuple:
+    """
+    Hashable key for a position built from python-chess's integer bitboards.
+    
+    Cheaper than generating a FEN string, and covers everything that
+    decides the legal moves: placement, side to move, castling and en passant.
+    """
+    return (
+        board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings,
+        board.occupied_co[chess.WHITE], board.castling_rights, board.ep_square, board.turn
+    )
+
+# Number of moves written to the move log between fsync calls
+MOVE_LOG_FSYNC_EVERY = 10
+
+# CPU cores split between the engines and the browser. On machines with at
+# least four cores the last two are left to Chrome and Selenium so their
+# threads do not compete with the search for the same cores and cache.
+if hasattr(os, "sched_getaffinity"):
+    _AVAILABLE_CORES = sorted(os.sched_getaffinity(0))
+else:
+    _AVAILABLE_CORES = list(range(os.cpu_count() or 1))
+BROWSER_CORES = set(_AVAILABLE_CORES[-2:]) if len(_AVAILABLE_CORES) >= 4 else set(_AVAILABLE_CORES)
+ENGINE_CORES = set(_AVAILABLE_CORES[:-2]) if len(_AVAILABLE_CORES) >= 4 else set(_AVAILABLE_CORES)
+
+# Hash per engine process, in MB
+ENGINE_HASH_MB = 1024
+
+def _set_affinity(pid: int, cores: set) -> None:
+    """Pin a thread (pid 0 is the calling thread) to a set of cores where the platform supports it."""
+    if hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(pid, cores)
+        except OSError:
+            pass
+
+# Each bot runs its own pair of Stockfish processes, one for the move being
+# played and one that ponders the next position, so bots never reset each
+# other's hash with ucinewgame. Pairs released by finished bots stay warm
+# here for the next bot: (stockfish path, engine, ponder engine)
+_IDLE_ENGINES: List[Tuple[str, Any, Any]] = []
+
+# Transport of each running engine, used to kill it if quitting hangs
+_ENGINE_TRANSPORTS: Dict[Any, Any] = {}
+
+# Seconds to wait for an engine to quit before killing it
+ENGINE_QUIT_TIMEOUT = 2.0
+
+async def _spawn_engine(stockfish_path: str) -> chess.engine.Protocol:
+    """Start and configure a Stockfish process."""
+    popen_args = {}
+    if hasattr(os, "sched_setaffinity"):
+        # Pin the child before exec: affinity is per thread, and Stockfish
+        # starts its search thread before anything could pin it from outside
+        popen_args["preexec_fn"] = lambda: _set_affinity(0, ENGINE_CORES)
+    
+    try:
+        # Own process group, so a wedged engine and anything it spawned can be
+        # killed together
+        transport, engine = await chess.engine.popen_uci(stockfish_path, setpgrp=True, **popen_args)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Stockfish not found at {stockfish_path}")
+    
+    _ENGINE_TRANSPORTS[engine] = transport
+    
+    # A larger hash keeps the transposition table useful across turns; the
+    # two engines split the engine cores between them
+    options = {
+        "Skill Level": 15,
+        "Threads": max(1, len(ENGINE_CORES) // 2),
+        "Hash": ENGINE_HASH_MB
+    }
+    # Older Stockfish releases make NNUE optional; newer ones always use it
+    if "Use NNUE" in engine.options:
+        options["Use NNUE"] = True
+    try:
+        await engine.configure(options)
+    except BaseException:
+        await _quit_engine(engine)
+        raise
+    return engine
+
+async def _quit_engine(engine: chess.engine.Protocol) -> None:
+    """Quit an engine, killing its process group if it does not exit in time."""
+    transport = _ENGINE_TRANSPORTS.pop(engine, None)
+    try:
+        await asyncio.wait_for(engine.quit(), timeout=ENGINE_QUIT_TIMEOUT)
+        return
+    except Exception:
+        pass
+    
+    if transport is None:
+        return
+    
+    # quit() hung or failed, e.g. the engine is stuck mid-search
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(transport.get_pid(), signal.SIGKILL)
+        else:
+            transport.kill()
+    except (OSError, ProcessLookupError):
+        pass
+
+async def shutdown_engines() -> None:
+    """Quit every Stockfish process that is still running, idle or not."""
+    _IDLE_ENGINES.clear()
+    
+    # The bots' locks are not taken here: a wedged search would hold them
+    # forever, and quitting cancels any search in progress anyway
+    for engine in list(_ENGINE_TRANSPORTS):
+        await _quit_engine(engine)
 
 class ChessComBot:
     """
     Chess.com training bot with Chess.com specific move execution.
     """
     
-    def __init__(self, stockfish_path: str, headless: bool = False, log_moves: bool = True):
+    ANALYSIS_URL = "https://www.chess.com/analysis"
+    LOGIN_URL = "https://www.chess.com/login?next=%2Fanalysis"
+    
+    # Login page locators, ordered by how often they match on Chess.com
+    USERNAME_SELECTORS = (
+        (By.ID, "username"),
+        (By.CSS_SELECTOR, "input[name='_username']"),
+        (By.NAME, "username"),
+        (By.CSS_SELECTOR, "input[placeholder*='username' i]"),
+        (By.CSS_SELECTOR, "input[type='text']")
+    )
+    PASSWORD_SELECTORS = (
+        (By.ID, "password"),
+        (By.CSS_SELECTOR, "input[name='_password']"),
+        (By.CSS_SELECTOR, "input[type='password']"),
+        (By.NAME, "password")
+    )
+    LOGIN_BUTTON_SELECTORS = (
+        (By.ID, "login"),
+        (By.CSS_SELECTOR, "button[type='submit']"),
+        (By.CSS_SELECTOR, "input[type='submit']"),
+        (By.XPATH, "//button[contains(text(), 'Log In')]"),
+        (By.XPATH, "//input[@value='Log In']")
+    )
+    # Any of these on the page means we are logged in; they are grouped into
+    # one CSS selector so each poll is a single find_elements round-trip
+    LOGIN_SUCCESS_SELECTORS = (
+        ".user-username-component",
+        "[data-username]",
+        ".nav-user-dropdown",
+        "a[href*='/member/']",
+        ".username"
+    )
+    
+    # Seconds to wait on each locator before falling back to the next one
+    SELECTOR_TIMEOUT = 2
+    
+    # Seconds to wait for any login success marker to appear
+    LOGIN_SUCCESS_TIMEOUT = 10
+    
+    # Poll interval for page-load waits; Selenium's default of 0.5s adds up
+    # to half a second of dead time to every condition
+    WAIT_POLL_FREQUENCY = 0.1
+    
+    # Controls that reset the analysis board to a new game
+    NEW_GAME_SELECTORS = (
+        "button[aria-label='New Game']",
+        "button[aria-label='Reset']",
+        "[data-cy='analysis-new-game']",
+        ".board-controls-reset"
+    )
+    
+    # Seconds to wait for the board to show a fresh game after a reset
+    RESET_TIMEOUT = 5
+    
+    # Move list container, watched to detect when a move has been committed
+    MOVE_LIST_SELECTOR = "wc-simple-move-list, vertical-move-list, .move-list"
+    
+    # Fires dragstart/drop/dragend between two squares and returns the new FEN
+    DRAG_EVENTS_MOVE_JS = """
+    var fromSquare = arguments[0];
+    var toSquare = arguments[1];
+    var board = document.querySelector('wc-chess-board');
+    if (!board || !board.game || !board.game.fen) {
+        return null;
+    }
+    
+    var findSquare = function(square) {
+        return board.querySelector("[data-square='" + square + "']") ||
+            board.querySelector('.square-' + square);
+    };
+    var fromEl = findSquare(fromSquare);
+    var toEl = findSquare(toSquare);
+    if (!fromEl || !toEl) {
+        return null;
+    }
+    
+    var fenBefore = board.game.fen();
+    var dataTransfer = new DataTransfer();
+    var fire = function(el, type) {
+        el.dispatchEvent(new DragEvent(type, {bubbles: true, cancelable: true, dataTransfer: dataTransfer}));
+    };
+    fire(fromEl, 'dragstart');
+    fire(toEl, 'dragover');
+    fire(toEl, 'drop');
+    fire(fromEl, 'dragend');
+    
+    var fenAfter = board.game.fen();
+    return fenAfter !== fenBefore ? fenAfter : null;
+    """
+    
+    # Defines window.__botMove(from, to), which tries Chess.com's board APIs
+    # and falls back to mouse events on the squares
+    BOT_MOVE_FUNCTION_JS = """
+    window.__botMove = function(fromSquare, toSquare) {
+        // Try to find Chess.com board component
+        var board = document.querySelector('wc-chess-board');
+        if (board) {
+            try {
+                // Try to access board's internal methods
+                if (board.game && board.game.move) {
+                    var result = board.game.move({from: fromSquare, to: toSquare});
+                    if (result) {
+                        console.log('Move executed via game.move()');
+                        return true;
+                    }
+                }
+                
+                // Try alternative method
+                if (board.move) {
+                    var result = board.move(fromSquare, toSquare);
+                    if (result) {
+                        console.log('Move executed via board.move()');
+                        return true;
+                    }
+                }
+                
+                // Try to trigger mouse events on squares
+                var squares = board.querySelectorAll('[class*="square"]');
+                var fromEl = null, toEl = null;
+                
+                squares.forEach(function(square) {
+                    var classes = square.className;
+                    if (classes.includes('square-' + fromSquare)) {
+                        fromEl = square;
+                    }
+                    if (classes.includes('square-' + toSquare)) {
+                        toEl = square;
+                    }
+                });
+                
+                if (fromEl && toEl) {
+                    // Simulate mouse events
+                    var mouseDown = new MouseEvent('mousedown', {bubbles: true});
+                    var mouseUp = new MouseEvent('mouseup', {bubbles: true});
+                    var click = new MouseEvent('click', {bubbles: true});
+                    
+                    fromEl.dispatchEvent(mouseDown);
+                    fromEl.dispatchEvent(click);
+                    
+                    setTimeout(function() {
+                        toEl.dispatchEvent(mouseUp);
+                        toEl.dispatchEvent(click);
+                    }, 100);
+                    
+                    console.log('Move executed via mouse events');
+                    return true;
+                }
+                
+            } catch(e) {
+                console.log('JavaScript move error:', e);
+            }
+        }
+        
+        return false;
+    };
+    """
+    
+    # Calls the installed move handler; null means it is not installed
+    CALL_BOT_MOVE_JS = "return window.__botMove ? window.__botMove(arguments[0], arguments[1]) : null;"
+    
+    # Serializes the board FEN, side to move, piece placement and move list in one call
+    READ_BOARD_STATE_JS = """
+    var board = document.querySelector('wc-chess-board');
+    var state = {fen: null, turn: null, pieces: [], moves: []};
+    if (board) {
+        try {
+            if (board.game && board.game.getFEN) {
+                state.fen = board.game.getFEN();
+            } else if (board.game && board.game.fen) {
+                state.fen = board.game.fen();
+            }
+        } catch (e) {
+            // Fall back to reading piece classes
+        }
+        try {
+            if (board.game && board.game.getTurn) {
+                state.turn = board.game.getTurn();
+            }
+        } catch (e) {
+            // Fall back to counting plies
+        }
+        board.querySelectorAll('.piece').forEach(function(piece) {
+            state.pieces.push(piece.className);
+        });
+    }
+    var moveList = document.querySelector(arguments[0]);
+    if (moveList) {
+        // Plies are .node elements inside .move rows; older lists only have
+        // the rows, one per ply
+        var plies = moveList.querySelectorAll('.node');
+        if (!plies.length) {
+            plies = moveList.querySelectorAll('.move');
+        }
+        plies.forEach(function(ply) {
+            state.moves.push(ply.textContent.trim());
+        });
+    }
+    return state;
+    """
+    
+    # Returns the first visible element matching a list of CSS selectors
+    FIND_FIRST_VISIBLE_JS = """
+    var selectors = arguments[0];
+    for (var i = 0; i < selectors.length; i++) {
+        try {
+            var el = document.querySelector(selectors[i]);
+            if (el && el.offsetParent) {
+                return el;
+            }
+        } catch (e) {
+            // Invalid selector for this document, try the next one
+        }
+    }
+    return null;
+    """
+    
+    # Clicks the first visible element matching a list of CSS selectors
+    # and returns the selector that matched
+    CLICK_FIRST_VISIBLE_JS = """
+    var selectors = arguments[0];
+    for (var i = 0; i < selectors.length; i++) {
+        try {
+            var el = document.querySelector(selectors[i]);
+            if (el && el.offsetParent) {
+                el.click();
+                return selectors[i];
+            }
+        } catch (e) {
+            // Invalid selector for this document, try the next one
+        }
+    }
+    return null;
+    """
+    
+    def __init__(self, stockfish_path: str, headless: bool = False, log_moves: bool = True,
+                 book_path: Optional[str] = None, idle_close_after: Optional[float] = None,
+                 min_move_interval: float = 0.0):
         """Initialize the Chess.com bot."""
         self.stockfish_path = stockfish_path
         self.headless = headless
         self.log_moves = log_moves
+        self.book_path = book_path
+        self.idle_close_after = idle_close_after
+        self.min_move_interval = min_move_interval
+        self._last_move_t = 0.0
         self.driver = None
+        self._actions = None
         self.engine = None
+        self.ponder_engine = None
+        self._idle_timer = None
+        self._last_search_t = 0.0
+        
+        # UCI handles one search at a time, so each engine has its own lock
+        self._engine_lock = asyncio.Lock()
+        self._ponder_lock = asyncio.Lock()
+        
+        # Background search of the next position: (position key, task)
+        self._ponder = None
+        
+        # Moves of the current game in SAN, and the move number/turn it started at
+        self._san_log: List[str] = []
+        self._san_log_start: Tuple[int, bool] = (1, chess.WHITE)
+        
+        self._book = None
         self.board = chess.Board()
-        self.move_log = []
+        self._move_log_fd = None
+        self._move_log_name = None
+        self._move_log_unsynced = 0
+        
+        # Board geometry, primed once the board has loaded
+        self._board_element = None
+        self._board_rect = None
+        self._square_centers: Dict[str, Tuple[int, int]] = {}
+        
+        # Identifies the current game to the engine; a new key means ucinewgame
+        self._game_id = None
+        
+        # Name of the move execution method that last succeeded
+        self._move_method = None
         
         # Configure logging
         logging.basicConfig(
@@ -73,8 +490,32 @@ class ChessComBot:
             chrome_options.add_experimental_option('useAutomationExtension', False)
             chrome_options.add_argument("--window-size=1400,900")
             
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            # The bot never looks at the page, so skip images and background throttling
+            chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+            chrome_options.add_argument("--disable-features=Translate,AcceptCHFrame")
+            chrome_options.add_argument("--disable-background-timer-throttling")
+            chrome_options.add_argument("--disable-gpu")
+            chrome_options.add_argument("--disable-extensions")
+            chrome_options.add_argument("--renderer-process-limit=1")
+            chrome_options.add_experimental_option("prefs", {
+                "profile.managed_default_content_settings.images": 2
+            })
+            
+            service = Service(self.resolve_chromedriver_path())
+            
+            # ChromeDriver and Chrome inherit the affinity of the thread that
+            # starts them. This runs on a shared executor thread, so its own
+            # affinity is put back once the browser is up.
+            previous_cores = os.sched_getaffinity(0) if hasattr(os, "sched_getaffinity") else None
+            _set_affinity(0, BROWSER_CORES)
+            try:
+                self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            finally:
+                if previous_cores:
+                    _set_affinity(0, previous_cores)
+            
+            # Reused for every keyboard move; zero duration skips pointer interpolation
+            self._actions = ActionChains(self.driver, duration=0)
             
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
             self.logger.info("Browser setup completed successfully")
@@ -83,19 +524,87 @@ class ChessComBot:
             self.logger.error(f"Failed to setup browser: {str(e)}")
             raise
     
-    def setup_engine(self) -> None:
-        """Initialize the Stockfish engine."""
-        try:
-            if not os.path.exists(self.stockfish_path):
-                raise FileNotFoundError(f"Stockfish not found at {self.stockfish_path}")
-            
-            self.engine = chess.engine.SimpleEngine.popen_uci(self.stockfish_path)
+    def get_chrome_major_version(self) -> Optional[str]:
+        """Return the installed Chrome major version, if it can be determined."""
+        for binary in ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser"):
+            try:
+                output = subprocess.check_output([binary, "--version"], stderr=subprocess.DEVNULL, timeout=5)
+            except (OSError, subprocess.SubprocessError):
+                continue
             
-            self.engine.configure({
-                "Skill Level": 15,
-                "Threads": 1,
-                "Hash": 16
-            })
+            match = re.search(r"(\d+)\.\d+", output.decode(errors="ignore"))
+            if match:
+                return match.group(1)
+        
+        return None
+    
+    def resolve_chromedriver_path(self) -> str:
+        """
+        Resolve the ChromeDriver binary, reusing a cached path when possible.
+        
+        ChromeDriverManager().install() checks for new releases over the
+        network, so its result is cached per Chrome major version and reused
+        while the binary still exists.
+        
+        Returns:
+            str: Path to the ChromeDriver binary
+        """
+        chrome_major = self.get_chrome_major_version()
+        
+        cache = {}
+        if chrome_major:
+            try:
+                with open(DRIVER_CACHE_PATH) as f:
+                    cache = json.load(f)
+                cached_path = cache.get(chrome_major)
+                if cached_path and os.path.isfile(cached_path):
+                    self.logger.info(f"Using cached ChromeDriver for Chrome {chrome_major}: {cached_path}")
+                    return cached_path
+            except (OSError, ValueError):
+                cache = {}
+        
+        driver_path = ChromeDriverManager().install()
+        
+        if chrome_major:
+            try:
+                cache[chrome_major] = driver_path
+                _write_json_atomic(DRIVER_CACHE_PATH, cache, indent=2)
+            except OSError as e:
+                self.logger.debug(f"Could not update ChromeDriver cache: {str(e)}")
+        
+        return driver_path
+    
+    async def setup_engine(self) -> None:
+        """Start this bot's Stockfish engines, reusing a warm pair if one is idle."""
+        self.load_move_cache()
+        try:
+            async with self._engine_lock:
+                if self.engine is not None:
+                    return
+                
+                for index, (path, engine, ponder_engine) in enumerate(_IDLE_ENGINES):
+                    if path == self.stockfish_path:
+                        del _IDLE_ENGINES[index]
+                        self.engine = engine
+                        self.ponder_engine = ponder_engine
+                        self.logger.info("Reusing running Stockfish engines")
+                        return
+                
+                results = await asyncio.gather(
+                    _spawn_engine(self.stockfish_path),
+                    _spawn_engine(self.stockfish_path),
+                    return_exceptions=True
+                )
+                
+                # Quit whichever engine did start, or it leaks along with its hash
+                errors = [result for result in results if isinstance(result, BaseException)]
+                if errors:
+                    for result in results:
+                        if not isinstance(result, BaseException):
+                            await _quit_engine(result)
+                    raise errors[0]
+                
+                self.engine, self.ponder_engine = results
             
             self.logger.info("Stockfish engine initialized successfully")
             
@@ -118,45 +627,50 @@ class ChessComBot:
                 ".ui_outside-close-component"
             ]
             
-            for selector in popup_selectors:
-                try:
-                    popup = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    if popup.is_displayed():
-                        popup.click()
-                        self.logger.info(f"Dismissed popup with selector: {selector}")
-                        time.sleep(1)
-                        break
-                except NoSuchElementException:
-                    continue
+            # Find and click the first visible popup in a single round-trip
+            selector = self.driver.execute_script(self.CLICK_FIRST_VISIBLE_JS, popup_selectors)
+            if selector:
+                self.logger.info(f"Dismissed popup with selector: {selector}")
                     
         except Exception as e:
             self.logger.debug(f"No popups to handle: {str(e)}")
     
+    def _find_first_js(self, selectors: List[str]) -> Optional[Any]:
+        """
+        Return the first visible element matching any of the selectors.
+        
+        The whole selector cascade runs inside the browser, so it costs one
+        WebDriver round-trip regardless of how many selectors are tried.
+        
+        Args:
+            selectors (List[str]): CSS selectors in order of preference
+            
+        Returns:
+            Optional[Any]: The first visible matching element, or None
+        """
+        try:
+            return self.driver.execute_script(self.FIND_FIRST_VISIBLE_JS, selectors)
+        except WebDriverException as e:
+            self.logger.debug(f"Selector cascade failed: {str(e)}")
+            return None
+    
     def login(self, username: str, password: str) -> bool:
         """Log into Chess.com with provided credentials."""
         try:
             self.logger.info("Attempting to log into Chess.com")
-            self.driver.get("https://www.chess.com/login")
+            # Logging in redirects straight to the analysis board, saving a page load
+            self.driver.get(self.LOGIN_URL)
             
-            wait = WebDriverWait(self.driver, 20)
+            wait = WebDriverWait(self.driver, 20, poll_frequency=self.WAIT_POLL_FREQUENCY)
+            selector_wait = WebDriverWait(self.driver, self.SELECTOR_TIMEOUT, poll_frequency=self.WAIT_POLL_FREQUENCY)
             
-            time.sleep(2)
             self.handle_popups()
-            time.sleep(3)
             
             # Find username field
             username_field = None
-            username_selectors = [
-                (By.ID, "username"),
-                (By.NAME, "username"),
-                (By.CSS_SELECTOR, "input[placeholder*='username' i]"),
-                (By.CSS_SELECTOR, "input[type='text']"),
-                (By.CSS_SELECTOR, "input[name='_username']")
-            ]
-            
-            for selector_type, selector_value in username_selectors:
+            for selector_type, selector_value in self.USERNAME_SELECTORS:
                 try:
-                    username_field = wait.until(EC.element_to_be_clickable((selector_type, selector_value)))
+                    username_field = selector_wait.until(EC.element_to_be_clickable((selector_type, selector_value)))
                     self.logger.info(f"Found username field with selector: {selector_type}={selector_value}")
                     break
                 except TimeoutException:
@@ -167,25 +681,16 @@ class ChessComBot:
                 return False
             
             username_field.clear()
-            time.sleep(0.5)
             username_field.send_keys(username)
             
             # Find password field
             password_field = None
-            password_selectors = [
-                (By.ID, "password"),
-                (By.NAME, "password"),
-                (By.CSS_SELECTOR, "input[type='password']"),
-                (By.CSS_SELECTOR, "input[name='_password']")
-            ]
-            
-            for selector_type, selector_value in password_selectors:
+            for selector_type, selector_value in self.PASSWORD_SELECTORS:
                 try:
-                    password_field = self.driver.find_element(selector_type, selector_value)
-                    if password_field.is_displayed() and password_field.is_enabled():
-                        self.logger.info(f"Found password field with selector: {selector_type}={selector_value}")
-                        break
-                except NoSuchElementException:
+                    password_field = selector_wait.until(EC.visibility_of_element_located((selector_type, selector_value)))
+                    self.logger.info(f"Found password field with selector: {selector_type}={selector_value}")
+                    break
+                except TimeoutException:
                     continue
             
             if not password_field:
@@ -193,52 +698,40 @@ class ChessComBot:
                 return False
             
             password_field.clear()
-            time.sleep(0.5)
             password_field.send_keys(password)
             
             # Find login button
             login_button = None
-            login_selectors = [
-                (By.ID, "login"),
-                (By.CSS_SELECTOR, "button[type='submit']"),
-                (By.CSS_SELECTOR, "input[type='submit']"),
-                (By.XPATH, "//button[contains(text(), 'Log In')]"),
-                (By.XPATH, "//input[@value='Log In']")
-            ]
-            
-            for selector_type, selector_value in login_selectors:
+            for selector_type, selector_value in self.LOGIN_BUTTON_SELECTORS:
                 try:
-                    login_button = self.driver.find_element(selector_type, selector_value)
-                    if login_button.is_displayed() and login_button.is_enabled():
-                        self.logger.info(f"Found login button with selector: {selector_type}={selector_value}")
-                        break
-                except NoSuchElementException:
+                    login_button = selector_wait.until(EC.element_to_be_clickable((selector_type, selector_value)))
+                    self.logger.info(f"Found login button with selector: {selector_type}={selector_value}")
+                    break
+                except TimeoutException:
                     continue
             
             if not login_button:
                 self.logger.error("Could not find login button")
                 return False
             
-            time.sleep(0.5)
+            login_url = self.driver.current_url
             login_button.click()
-            time.sleep(5)
             
-            # Check login success
-            success_selectors = [
-                (By.CLASS_NAME, "user-username-component"),
-                (By.CSS_SELECTOR, "[data-username]"),
-                (By.CSS_SELECTOR, ".username"),
-                (By.XPATH, "//a[contains(@href, '/member/')]"),
-                (By.CSS_SELECTOR, ".nav-user-dropdown")
-            ]
+            # Wait for the submit to navigate away instead of sleeping a fixed time
+            try:
+                wait.until(EC.url_changes(login_url))
+            except TimeoutException:
+                self.logger.debug("URL did not change after login submit")
             
-            for selector_type, selector_value in success_selectors:
-                try:
-                    wait.until(EC.presence_of_element_located((selector_type, selector_value)))
-                    self.logger.info("Login successful")
-                    return True
-                except TimeoutException:
-                    continue
+            # Check login success
+            try:
+                WebDriverWait(self.driver, self.LOGIN_SUCCESS_TIMEOUT, poll_frequency=self.WAIT_POLL_FREQUENCY).until(
+                    lambda driver: driver.find_elements(By.CSS_SELECTOR, ",".join(self.LOGIN_SUCCESS_SELECTORS))
+                )
+                self.logger.info("Login successful")
+                return True
+            except TimeoutException:
+                pass
             
             if "login" in self.driver.current_url.lower():
                 self.logger.error("Login failed - still on login page")
@@ -251,13 +744,16 @@ class ChessComBot:
             self.logger.error(f"Login failed: {str(e)}")
             return False
     
-    def navigate_to_analysis_board(self) -> bool:
-        """Navigate to the analysis board on Chess.com."""
+    def navigate_to_analysis_board(self, reload: bool = False) -> bool:
+        """Navigate to the analysis board on Chess.com, unless already there."""
         try:
-            self.logger.info("Navigating to analysis board")
-            self.driver.get("https://www.chess.com/analysis")
+            if not reload and "/analysis" in self.driver.current_url:
+                self.logger.info("Already on analysis board")
+            else:
+                self.logger.info("Navigating to analysis board")
+                self.driver.get(self.ANALYSIS_URL)
             
-            wait = WebDriverWait(self.driver, 15)
+            wait = WebDriverWait(self.driver, 15, poll_frequency=self.WAIT_POLL_FREQUENCY)
             
             # Wait for chess board to load
             board_selectors = [
@@ -286,8 +782,11 @@ class ChessComBot:
                 self.logger.error("Could not find chess board element")
                 return False
             
-            time.sleep(3)
             self.handle_popups()
+            self.disable_animations()
+            self.install_move_commit_observer()
+            self.install_move_function()
+            self._prime_board_geometry()
             
             self.logger.info("Successfully navigated to analysis board")
             return True
@@ -296,6 +795,48 @@ class ChessComBot:
             self.logger.error(f"Navigation failed: {str(e)}")
             return False
     
+    def disable_animations(self) -> None:
+        """Inject a stylesheet that turns off CSS animations and transitions."""
+        try:
+            self.driver.execute_script("""
+            var style = document.createElement('style');
+            style.id = 'chess-bot-no-animations';
+            style.textContent = '*, *::before, *::after { animation: none !important; transition: none !important; }';
+            if (!document.getElementById(style.id)) {
+                document.head.appendChild(style);
+            }
+            """)
+            self.logger.debug("CSS animations disabled")
+        except WebDriverException as e:
+            self.logger.debug(f"Could not disable animations: {str(e)}")
+    
+    def _prime_board_geometry(self) -> None:
+        """Read the board rect once and precompute the center of every square."""
+        try:
+            self._board_element = self.driver.find_element(By.TAG_NAME, "wc-chess-board")
+            self._board_rect = self._board_element.rect
+            
+            square_width = self._board_rect['width'] / 8
+            square_height = self._board_rect['height'] / 8
+            
+            # Assuming white perspective: file 0 (a) is leftmost, rank 0 (1) is bottom
+            self._square_centers = {}
+            for file_index in range(8):
+                for rank_index in range(8):
+                    square = chr(ord('a') + file_index) + str(rank_index + 1)
+                    self._square_centers[square] = (
+                        int((file_index * square_width) + (square_width / 2)),
+                        int(((7 - rank_index) * square_height) + (square_height / 2))
+                    )
+            
+            self.logger.debug(f"Board geometry primed: {self._board_rect}")
+            
+        except Exception as e:
+            self._board_element = None
+            self._board_rect = None
+            self._square_centers = {}
+            self.logger.error(f"Failed to prime board geometry: {str(e)}")
+    
     def find_square_element(self, square: str) -> Optional[Any]:
         """
         Find a specific square element on the Chess.com board.
@@ -315,14 +856,10 @@ class ChessComBot:
                 f"[class*='{square}']"
             ]
             
-            for selector in square_selectors:
-                try:
-                    element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    if element and element.is_displayed():
-                        self.logger.debug(f"Found square {square} with selector: {selector}")
-                        return element
-                except NoSuchElementException:
-                    continue
+            element = self._find_first_js(square_selectors)
+            if element:
+                self.logger.debug(f"Found square {square} via selector cascade")
+                return element
             
             # If no direct square found, try calculating position within board
             return self.find_square_by_position(square)
@@ -342,20 +879,18 @@ class ChessComBot:
             Optional[Any]: Square element or board element with calculated offset
         """
         try:
-            board_element = self.driver.find_element(By.TAG_NAME, "wc-chess-board")
-            if not board_element:
+            if not self._square_centers:
+                self._prime_board_geometry()
+            if not self._board_element or square not in self._square_centers:
                 return None
             
             # Create a virtual square element with position data
-            file_char = square[0]  # a-h
-            rank_char = square[1]  # 1-8
-            
-            file_index = ord(file_char) - ord('a')  # 0-7
-            rank_index = int(rank_char) - 1  # 0-7
+            file_index = ord(square[0]) - ord('a')  # 0-7
+            rank_index = int(square[1]) - 1  # 0-7
             
             # Store position data for later use
             square_info = {
-                'element': board_element,
+                'element': self._board_element,
                 'file_index': file_index,
                 'rank_index': rank_index,
                 'square': square
@@ -378,27 +913,11 @@ class ChessComBot:
             Tuple[int, int]: (x, y) coordinates relative to board
         """
         try:
-            board_element = square_info['element']
-            file_index = square_info['file_index']
-            rank_index = square_info['rank_index']
-            
-            # Get board dimensions
-            rect = board_element.rect
-            board_width = rect['width']
-            board_height = rect['height']
-            
-            # Calculate square size
-            square_width = board_width / 8
-            square_height = board_height / 8
-            
-            # Calculate center position (assuming white perspective)
-            # File 0 (a) is leftmost, rank 0 (1) is bottom
-            x_offset = (file_index * square_width) + (square_width / 2)
-            y_offset = ((7 - rank_index) * square_height) + (square_height / 2)
+            x_offset, y_offset = self._square_centers[square_info['square']]
             
             self.logger.debug(f"Square {square_info['square']}: offset ({x_offset}, {y_offset})")
             
-            return int(x_offset), int(y_offset)
+            return x_offset, y_offset
             
         except Exception as e:
             self.logger.error(f"Error calculating coordinates: {str(e)}")
@@ -433,28 +952,36 @@ class ChessComBot:
                 self.logger.error("Invalid coordinates calculated")
                 return False
             
-            # Scroll board into view
-            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", board_element)
-            time.sleep(0.5)
-            
-            # Perform drag and drop with Chess.com specific events
-            actions = ActionChains(self.driver)
-            
-            # Move to source square and start drag
-            actions.move_to_element_with_offset(board_element, from_x, from_y)
-            actions.click_and_hold()
-            actions.pause(0.1)
-            
-            # Drag to destination
-            actions.move_to_element_with_offset(board_element, to_x, to_y)
-            actions.pause(0.1)
-            actions.release()
-            
-            # Execute the action chain
-            actions.perform()
-            
-            # Wait for move animation
-            time.sleep(1.5)
+            # Scroll board into view and read its viewport position in one call
+            origin = self.driver.execute_script(
+                "arguments[0].scrollIntoView({block: 'center'});"
+                "var r = arguments[0].getBoundingClientRect();"
+                "return {x: r.left, y: r.top};",
+                board_element
+            )
+            
+            self._arm_move_commit()
+            
+            # Dispatch the drag through DevTools so the browser sees native
+            # mouse input without a chain of WebDriver action commands
+            for event_type, x, y in (
+                ("mousePressed", from_x, from_y),
+                ("mouseMoved", to_x, to_y),
+                ("mouseReleased", to_x, to_y)
+            ):
+                self.driver.execute_cdp_cmd("Input.dispatchMouseEvent", {
+                    "type": event_type,
+                    "x": origin['x'] + x,
+                    "y": origin['y'] + y,
+                    "button": "left",
+                    "buttons": 0 if event_type == "mouseReleased" else 1,
+                    "clickCount": 1
+                })
+            
+            # Wait for the move list to grow instead of a fixed animation delay
+            if not self._wait_for_move_commit():
+                self.logger.warning(f"Drag-drop move was not registered: {move}")
+                return False
             
             self.logger.info(f"Drag-drop move completed: {move}")
             return True
@@ -463,6 +990,101 @@ class ChessComBot:
             self.logger.error(f"Drag-drop move failed {move}: {str(e)}")
             return False
     
+    def execute_move_with_drag_events(self, move: chess.Move) -> bool:
+        """
+        Execute move by dispatching synthetic HTML5 drag events on the squares.
+        """
+        try:
+            from_square = chess.square_name(move.from_square)
+            to_square = chess.square_name(move.to_square)
+            
+            self.logger.info(f"Executing move via drag events: {from_square} to {to_square}")
+            
+            # Returns the board FEN after the drop, or null if it did not change
+            new_fen = self.driver.execute_script(self.DRAG_EVENTS_MOVE_JS, from_square, to_square)
+            
+            if new_fen:
+                self.logger.info(f"Drag events move executed successfully: {move} ({new_fen})")
+                return True
+            else:
+                self.logger.debug("Drag events did not change the board position")
+                return False
+                
+        except Exception as e:
+            self.logger.error(f"Drag events move failed {move}: {str(e)}")
+            return False
+    
+    def install_move_function(self) -> None:
+        """Install window.__botMove once so moves only send their squares."""
+        try:
+            self.driver.execute_script(self.BOT_MOVE_FUNCTION_JS)
+        except WebDriverException as e:
+            self.logger.debug(f"Could not install JavaScript move handler: {str(e)}")
+    
+    def install_move_commit_observer(self) -> None:
+        """
+        Install the in-page helper used to detect when a move is committed.
+        
+        window.__armMoveCommit() attaches a MutationObserver to the move list
+        and stores a promise that resolves true on the first mutation, false
+        on timeout, or null when no move list exists on the page.
+        """
+        try:
+            self.driver.execute_script("""
+            var moveListSelector = arguments[0];
+            window.__armMoveCommit = function(timeoutMs) {
+                var moveList = document.querySelector(moveListSelector);
+                if (!moveList) {
+                    window.__moveCommit = Promise.resolve(null);
+                    return false;
+                }
+                window.__moveCommit = new Promise(function(resolve) {
+                    var observer = new MutationObserver(function() {
+                        observer.disconnect();
+                        resolve(true);
+                    });
+                    observer.observe(moveList, {childList: true, subtree: true});
+                    setTimeout(function() {
+                        observer.disconnect();
+                        resolve(false);
+                    }, timeoutMs);
+                });
+                return true;
+            };
+            """, self.MOVE_LIST_SELECTOR)
+        except WebDriverException as e:
+            self.logger.debug(f"Could not install move commit observer: {str(e)}")
+    
+    def _arm_move_commit(self, timeout: float = 3.0) -> None:
+        """Start watching the move list; call before dispatching a move."""
+        try:
+            self.driver.execute_script(
+                "if (window.__armMoveCommit) { window.__armMoveCommit(arguments[0]); }"
+                "else { window.__moveCommit = Promise.resolve(null); }",
+                int(timeout * 1000)
+            )
+        except WebDriverException as e:
+            self.logger.debug(f"Could not arm move commit observer: {str(e)}")
+    
+    def _wait_for_move_commit(self) -> bool:
+        """
+        Wait for the move list mutation armed by _arm_move_commit.
+        
+        Returns:
+            bool: False if the move list did not change before the timeout,
+            True if it did or if there is no move list to watch
+        """
+        try:
+            committed = self.driver.execute_async_script(
+                "var done = arguments[arguments.length - 1];"
+                "(window.__moveCommit || Promise.resolve(null)).then(done);"
+            )
+        except WebDriverException as e:
+            self.logger.debug(f"Move commit wait failed: {str(e)}")
+            committed = None
+        
+        return committed is not False
+    
     def execute_move_with_javascript(self, move: chess.Move) -> bool:
         """
         Execute move using JavaScript to directly interact with Chess.com's board.
@@ -473,79 +1095,19 @@ class ChessComBot:
             
             self.logger.info(f"Executing move via JavaScript: {from_square} to {to_square}")
             
-            # JavaScript code to interact with Chess.com's board
-            js_code = f"""
-            var fromSquare = '{from_square}';
-            var toSquare = '{to_square}';
-            
-            // Try to find Chess.com board component
-            var board = document.querySelector('wc-chess-board');
-            if (board) {{
-                try {{
-                    // Try to access board's internal methods
-                    if (board.game && board.game.move) {{
-                        var result = board.game.move({{from: fromSquare, to: toSquare}});
-                        if (result) {{
-                            console.log('Move executed via game.move()');
-                            return true;
-                        }}
-                    }}
-                    
-                    // Try alternative method
-                    if (board.move) {{
-                        var result = board.move(fromSquare, toSquare);
-                        if (result) {{
-                            console.log('Move executed via board.move()');
-                            return true;
-                        }}
-                    }}
-                    
-                    // Try to trigger mouse events on squares
-                    var squares = board.querySelectorAll('[class*="square"]');
-                    var fromEl = null, toEl = null;
-                    
-                    squares.forEach(function(square) {{
-                        var classes = square.className;
-                        if (classes.includes('square-' + fromSquare)) {{
-                            fromEl = square;
-                        }}
-                        if (classes.includes('square-' + toSquare)) {{
-                            toEl = square;
-                        }}
-                    }});
-                    
-                    if (fromEl && toEl) {{
-                        // Simulate mouse events
-                        var mouseDown = new MouseEvent('mousedown', {{bubbles: true}});
-                        var mouseUp = new MouseEvent('mouseup', {{bubbles: true}});
-                        var click = new MouseEvent('click', {{bubbles: true}});
-                        
-                        fromEl.dispatchEvent(mouseDown);
-                        fromEl.dispatchEvent(click);
-                        
-                        setTimeout(function() {{
-                            toEl.dispatchEvent(mouseUp);
-                            toEl.dispatchEvent(click);
-                        }}, 100);
-                        
-                        console.log('Move executed via mouse events');
-                        return true;
-                    }}
-                    
-                }} catch(e) {{
-                    console.log('JavaScript move error:', e);
-                }}
-            }}
-            
-            return false;
-            """
-            
-            # Execute JavaScript
-            result = self.driver.execute_script(js_code)
+            # Call the handler installed on the page; only the squares are sent
+            self._arm_move_commit()
+            result = self.driver.execute_script(self.CALL_BOT_MOVE_JS, from_square, to_square)
+            if result is None:
+                # Page was reloaded since the handler was installed
+                self.install_move_function()
+                result = self.driver.execute_script(self.CALL_BOT_MOVE_JS, from_square, to_square)
             
             if result:
+                if not self._wait_for_move_commit():
+                    self.logger.warning(f"JavaScript move was not registered: {move}")
+                    return False
                 self.logger.info(f"JavaScript move executed successfully: {move}")
-                time.sleep(1)
                 return True
             else:
                 self.logger.debug("JavaScript move execution returned false")
@@ -578,12 +1140,15 @@ class ChessComBot:
                 from selenium.webdriver.common.keys import Keys
                 
                 # Method 1: Direct typing
-                actions = ActionChains(self.driver)
-                actions.send_keys(move_notation)
-                actions.send_keys(Keys.ENTER)
-                actions.perform()
+                self._arm_move_commit()
+                self._actions.reset_actions()
+                self._actions.send_keys(move_notation)
+                self._actions.send_keys(Keys.ENTER)
+                self._actions.perform()
                 
-                time.sleep(1)
+                if not self._wait_for_move_commit():
+                    self.logger.warning(f"Keyboard move was not registered: {move}")
+                    return False
                 
                 self.logger.info(f"Keyboard move executed: {move}")
                 return True
@@ -594,29 +1159,339 @@ class ChessComBot:
             self.logger.error(f"Keyboard move failed {move}: {str(e)}")
             return False
     
+    def _read_board_state(self) -> Dict[str, Any]:
+        """
+        Read the board's FEN, pieces and move list in a single round-trip.
+        
+        Returns:
+            Dict[str, Any]: 'fen' (str or None), 'turn' ('w', 'b' or None),
+            'pieces' (piece class names) and 'moves' (one text per ply)
+        """
+        return self.driver.execute_script(self.READ_BOARD_STATE_JS, self.MOVE_LIST_SELECTOR) or {}
+    
     def get_board_state(self) -> Optional[chess.Board]:
         """Read the current board state."""
         try:
-            board = chess.Board()
-            self.logger.info("Using starting position for analysis board")
+            state = self._read_board_state()
+            
+            # Prefer the board component's own FEN when it exposes one
+            if state.get('fen'):
+                try:
+                    board = chess.Board(state['fen'])
+                    self.logger.info(f"Read board state: {board.fen()}")
+                    return board
+                except ValueError:
+                    self.logger.debug(f"Ignoring invalid FEN from page: {state['fen']}")
+            
+            # Otherwise rebuild the position from piece classes like "piece wp square-52"
+            pieces = state.get('pieces') or []
+            if not pieces:
+                board = chess.Board()
+                self.logger.info("Using starting position for analysis board")
+                return board
+            
+            board = chess.Board.empty()
+            for class_name in pieces:
+                tokens = class_name.split()
+                piece_code = next((t for t in tokens if len(t) == 2 and t[0] in 'wb' and t[1] in 'pnbrqk'), None)
+                square_code = next((t[7:] for t in tokens if t.startswith('square-') and len(t) == 9), None)
+                if not piece_code or not square_code or not square_code.isdigit():
+                    continue
+                
+                file_index = int(square_code[0]) - 1
+                rank_index = int(square_code[1]) - 1
+                if not (0 <= file_index < 8 and 0 <= rank_index < 8):
+                    continue
+                
+                symbol = piece_code[1].upper() if piece_code[0] == 'w' else piece_code[1]
+                board.set_piece_at(chess.square(file_index, rank_index), chess.Piece.from_symbol(symbol))
+            
+            if state.get('turn') in ('w', 'b'):
+                board.turn = chess.WHITE if state['turn'] == 'w' else chess.BLACK
+            else:
+                board.turn = chess.WHITE if len(state.get('moves') or []) % 2 == 0 else chess.BLACK
+            
+            # An empty board has no castling rights; grant them all and keep
+            # those whose king and rook are still on their home squares
+            board.castling_rights = chess.BB_A1 | chess.BB_H1 | chess.BB_A8 | chess.BB_H8
+            board.castling_rights = board.clean_castling_rights()
+            self.logger.info(f"Read board state: {board.fen()}")
             return board
             
         except Exception as e:
             self.logger.error(f"Failed to read board state: {str(e)}")
             return None
     
-    def calculate_best_move(self, board: chess.Board, time_limit: float = 1.0) -> Optional[chess.Move]:
-        """Calculate the best move using Stockfish engine."""
+    def find_forced_move(self, board: chess.Board) -> Optional[chess.Move]:
+        """Return the only legal move, or a move that mates immediately, if any."""
+        legal_moves = list(board.legal_moves)
+        if len(legal_moves) == 1:
+            return legal_moves[0]
+        
+        for move in legal_moves:
+            # Only checking moves can mate
+            if not board.gives_check(move):
+                continue
+            board.push(move)
+            is_mate = board.is_checkmate()
+            board.pop()
+            if is_mate:
+                return move
+        
+        return None
+    
+    def get_book_move(self, board: chess.Board) -> Optional[chess.Move]:
+        """Look up the position in the Polyglot opening book, if one is configured."""
+        if not self.book_path:
+            return None
+        
         try:
-            if board.is_game_over():
-                self.logger.info("Game is over, no moves to calculate")
-                return None
+            if self._book is None:
+                self._book = chess.polyglot.open_reader(self.book_path)
+                self.logger.info(f"Opening book loaded from {self.book_path}")
             
-            result = self.engine.play(board, chess.engine.Limit(time=time_limit))
+            return self._book.weighted_choice(board).move
             
-            if result.move:
-                self.logger.info(f"Calculated best move: {result.move}")
-                return result.move
+        except IndexError:
+            # Position is not in the book
+            return None
+        except Exception as e:
+            self.logger.error(f"Opening book lookup failed, disabling book: {str(e)}")
+            self.book_path = None
+            return None
+    
+    def _start_idle_timer(self, delay: Optional[float] = None) -> None:
+        """Schedule the engine to be shut down after idle_close_after seconds, or delay if given."""
+        if not self.idle_close_after:
+            return
+        
+        self._cancel_idle_timer()
+        self._idle_timer = asyncio.get_running_loop().call_later(
+            self.idle_close_after if delay is None else delay,
+            lambda: asyncio.ensure_future(self._close_idle_engine())
+        )
+    
+    def _cancel_idle_timer(self) -> None:
+        """Cancel a pending idle shutdown, if any."""
+        if self._idle_timer:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+    
+    async def _close_idle_engine(self) -> None:
+        """Quit the engine to free its memory; it is respawned on the next search."""
+        # Only this bot's engines are quit, and only once no search holds them
+        async with self._engine_lock:
+            if self.engine is None:
+                return
+            
+            # Moves and ponder searches since the timer was set keep the
+            # engines; check again once the bot has been idle long enough
+            idle_for = time.monotonic() - self._last_search_t
+            if idle_for < self.idle_close_after:
+                self._start_idle_timer(self.idle_close_after - idle_for)
+                return
+            
+            self.logger.info(f"Engine idle for {self.idle_close_after}s, shutting it down")
+            self.cancel_ponder()
+            async with self._ponder_lock:
+                engines = (self.engine, self.ponder_engine)
+                self.engine = None
+                self.ponder_engine = None
+                for engine in engines:
+                    if engine is not None:
+                        await _quit_engine(engine)
+    
+    def load_move_cache(self) -> None:
+        """Load cached engine moves from disk, once per session."""
+        global _MOVE_CACHE_LOADED
+        if _MOVE_CACHE_LOADED:
+            return
+        
+        _MOVE_CACHE_LOADED = True
+        try:
+            with open(MOVE_CACHE_PATH) as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Could not load move cache: {str(e)}")
+            return
+        
+        if not isinstance(entries, list):
+            self.logger.warning("Could not load move cache: unexpected format")
+            return
+        
+        # JSON stores the tuple keys as nested lists; damaged entries are skipped
+        skipped = 0
+        for entry in entries:
+            try:
+                key, uci = entry
+                if not isinstance(key[0], list) or not isinstance(uci, str):
+                    raise TypeError("malformed entry")
+                _MOVE_CACHE[(tuple(key[0]), key[1])] = uci
+            except (TypeError, ValueError, IndexError, KeyError):
+                skipped += 1
+        
+        if skipped:
+            self.logger.warning(f"Skipped {skipped} malformed move cache entries")
+        self.logger.info(f"Loaded {len(_MOVE_CACHE)} cached moves")
+    
+    def save_move_cache(self) -> None:
+        """Write cached engine moves to disk."""
+        if not _MOVE_CACHE:
+            return
+        
+        try:
+            _write_json_atomic(MOVE_CACHE_PATH, list(_MOVE_CACHE.items()))
+            self.logger.info(f"Saved {len(_MOVE_CACHE)} cached moves")
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Failed to save move cache: {str(e)}")
+    
+    def _move_cache_key(self, board: chess.Board, time_limit: float) -> Tuple:
+        """Key a position and search time for the move cache."""
+        return (_pos_key(board), time_limit)
+    
+    def get_cached_move(self, board: chess.Board, time_limit: float) -> Optional[chess.Move]:
+        """Return the cached engine move for this position, if it is still legal."""
+        key = self._move_cache_key(board, time_limit)
+        uci = _MOVE_CACHE.get(key)
+        if not uci:
+            return None
+        
+        move = chess.Move.from_uci(uci)
+        if move not in board.legal_moves:
+            del _MOVE_CACHE[key]
+            return None
+        
+        _MOVE_CACHE.move_to_end(key)
+        return move
+    
+    def cache_move(self, board: chess.Board, time_limit: float, move: chess.Move) -> None:
+        """Remember an engine move, evicting the least recently used entry when full."""
+        key = self._move_cache_key(board, time_limit)
+        _MOVE_CACHE[key] = move.uci()
+        _MOVE_CACHE.move_to_end(key)
+        if len(_MOVE_CACHE) > MOVE_CACHE_SIZE:
+            _MOVE_CACHE.popitem(last=False)
+    
+    def start_ponder(self, board: chess.Board, time_limit: float) -> None:
+        """
+        Search a position on the ponder engine in the background.
+        
+        The game loop calls this with the position after the move it is about
+        to play, so the next search overlaps with browser move execution. The
+        loop has already checked that this position is not game over.
+        
+        Args:
+            board (chess.Board): Position that will be searched next; it is
+                searched as is, so the caller must not change it afterwards
+            time_limit (float): Seconds to search for
+        """
+        # A retry of the same move keeps the search that is already running
+        if self._ponder and self._ponder[0] == _pos_key(board):
+            return
+        
+        self.cancel_ponder()
+        if self.ponder_engine is None:
+            return
+        
+        task = asyncio.create_task(self._ponder_search(board, time_limit))
+        self._ponder = (_pos_key(board), task)
+    
+    def cancel_ponder(self) -> None:
+        """Stop the background search, if one is running."""
+        if self._ponder:
+            self._ponder[1].cancel()
+            self._ponder = None
+    
+    async def _ponder_search(self, board: chess.Board, time_limit: float) -> Optional[chess.Move]:
+        """Run a search on the ponder engine and return its best move."""
+        try:
+            async with self._ponder_lock:
+                if self.ponder_engine is None:
+                    return None
+                # Pondering is engine activity too, for the idle timer
+                self._last_search_t = time.monotonic()
+                with await self.ponder_engine.analysis(board, chess.engine.Limit(time=time_limit), game=self._game_id) as analysis:
+                    best = await analysis.wait()
+                self._last_search_t = time.monotonic()
+            
+            # Cache right away so the result is usable even if nobody awaits it
+            move = best.move if best else None
+            if move:
+                self.cache_move(board, time_limit, move)
+            return move
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.logger.debug(f"Ponder search failed: {str(e)}")
+            return None
+    
+    async def _take_ponder_result(self, board: chess.Board) -> Optional[chess.Move]:
+        """Return the pondered move if it was searched for this exact position."""
+        if not self._ponder:
+            return None
+        
+        key, task = self._ponder
+        self._ponder = None
+        if key != _pos_key(board):
+            task.cancel()
+            return None
+        
+        return await task
+    
+    async def calculate_best_move(self, board: chess.Board, time_limit: float = 1.0) -> Optional[chess.Move]:
+        """
+        Calculate the best move using the opening book or Stockfish engine.
+        
+        The caller checks for game over, so the position is assumed to have
+        legal moves.
+        """
+        # Every move choice counts as activity, not just engine searches, so
+        # the engines are not shut down in the middle of a game
+        self._cancel_idle_timer()
+        self._last_search_t = time.monotonic()
+        
+        # The early returns keep any background search: start_ponder and
+        # _take_ponder_result cancel it if its position does not come up
+        try:
+            forced_move = self.find_forced_move(board)
+            if forced_move:
+                self.logger.info(f"Forced move: {forced_move}")
+                return forced_move
+            
+            book_move = self.get_book_move(board)
+            if book_move:
+                self.logger.info(f"Book move: {book_move}")
+                return book_move
+            
+            cached_move = self.get_cached_move(board, time_limit)
+            if cached_move:
+                self.logger.info(f"Cached move: {cached_move}")
+                return cached_move
+            
+            pondered_move = await self._take_ponder_result(board)
+            if pondered_move:
+                self.logger.info(f"Calculated best move (pondered): {pondered_move}")
+                return pondered_move
+            
+            # Respawn the engine if it was shut down while idle
+            if self.engine is None:
+                await self.setup_engine()
+            
+            # Searching under the same game key keeps Stockfish's transposition
+            # table warm between turns (no ucinewgame until the game changes)
+            async with self._engine_lock:
+                with await self.engine.analysis(board, chess.engine.Limit(time=time_limit), game=self._game_id) as analysis:
+                    best = await analysis.wait()
+                    move = best.move if best else None
+                    if not move and analysis.info.get("pv"):
+                        move = analysis.info["pv"][0]
+            
+            if move:
+                self.cache_move(board, time_limit, move)
+                self.logger.info(f"Calculated best move: {move}")
+                return move
             else:
                 self.logger.warning("Engine returned no move")
                 return None
@@ -624,6 +1499,8 @@ class ChessComBot:
         except Exception as e:
             self.logger.error(f"Move calculation failed: {str(e)}")
             return None
+        finally:
+            self._start_idle_timer()
     
     def execute_move(self, move: chess.Move) -> bool:
         """Execute a move on the Chess.com board using multiple methods."""
@@ -633,17 +1510,23 @@ class ChessComBot:
             
             self.logger.info(f"Executing move: {from_square} to {to_square}")
             
-            # Try multiple methods in order of preference
+            # Try multiple methods in order of preference, starting with the
+            # one that worked last time so the others are only tried on failure
             methods = [
+                ("drag_events", self.execute_move_with_drag_events),
                 ("drag_drop", self.execute_move_with_drag_drop),
                 ("javascript", self.execute_move_with_javascript),
                 ("keyboard", self.execute_move_with_keyboard)
             ]
+            if self._move_method:
+                methods.sort(key=lambda method: method[0] != self._move_method)
             
             for method_name, method_func in methods:
                 try:
                     self.logger.info(f"Trying {method_name} method...")
                     if method_func(move):
+                        self._move_method = method_name
+                        
                         # Log the successful move
                         if self.log_moves:
                             move_entry = {
@@ -653,7 +1536,7 @@ class ChessComBot:
                                 'to': to_square,
                                 'method': method_name
                             }
-                            self.move_log.append(move_entry)
+                            self.write_move_log_entry(move_entry)
                         
                         self.logger.info(f"Move executed successfully with {method_name}: {move}")
                         return True
@@ -668,200 +1551,414 @@ class ChessComBot:
             self.logger.error(f"Failed to execute move {move}: {str(e)}")
             return False
     
+    def write_move_log_entry(self, move_entry: Dict[str, Any]) -> None:
+        """Append a single move entry to the JSONL move log."""
+        try:
+            if self._move_log_fd is None:
+                self._move_log_name = f"chess_moves_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+                self._move_log_fd = os.open(self._move_log_name, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+                self._move_log_unsynced = 0
+                self.logger.info(f"Logging moves to {self._move_log_name}")
+            
+            # One unbuffered append per move, so a crash loses nothing already played
+            os.write(self._move_log_fd, (json.dumps(move_entry) + "\n").encode())
+            
+            # Force entries to disk every few moves rather than on every write
+            self._move_log_unsynced += 1
+            if self._move_log_unsynced >= MOVE_LOG_FSYNC_EVERY:
+                os.fsync(self._move_log_fd)
+                self._move_log_unsynced = 0
+            
+        except Exception as e:
+            self.logger.error(f"Failed to write move log entry: {str(e)}")
+    
     def save_move_log(self) -> None:
-        """Save move log to file."""
-        if self.move_log:
+        """Sync and close the move log file."""
+        if self._move_log_fd is not None:
             try:
-                filename = f"chess_moves_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-                with open(filename, 'w') as f:
-                    json.dump(self.move_log, f, indent=2)
-                self.logger.info(f"Move log saved to {filename}")
+                os.fsync(self._move_log_fd)
+                os.close(self._move_log_fd)
+                self.logger.info(f"Move log saved to {self._move_log_name}")
             except Exception as e:
                 self.logger.error(f"Failed to save move log: {str(e)}")
+            finally:
+                self._move_log_fd = None
+    
+    def format_movetext(self) -> str:
+        """Render the current game's SAN moves as numbered PGN movetext."""
+        number, white_to_move = self._san_log_start
+        parts = []
+        for index, san in enumerate(self._san_log):
+            if white_to_move:
+                parts.append(f"{number}. {san}")
+            elif index == 0:
+                parts.append(f"{number}... {san}")
+            else:
+                parts.append(san)
+                
+            if not white_to_move:
+                number += 1
+            white_to_move = not white_to_move
+        
+        return " ".join(parts)
+    
+    async def _pace_move(self) -> None:
+        """
+        Wait until min_move_interval has passed since the last move submission.
+        
+        Time spent on engine search and DOM work since then counts toward the
+        interval rather than being added on top of it.
+        """
+        remaining = self.min_move_interval - (time.monotonic() - self._last_move_t)
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+    
+    def _backoff_delay(self, failures: int) -> float:
+        """Exponential backoff with jitter: quick retry on a blip, capped at 30s."""
+        return min(30.0, 0.5 * (2 ** failures)) + random.uniform(0, 0.25)
     
-    def play_game_loop(self, max_moves: int = 100) -> None:
+    async def play_game_loop(self, max_moves: int = 100) -> None:
         """Main game loop for playing moves."""
         moves_played = 0
         consecutive_failures = 0
         max_failures = 3
-        current_board = chess.Board()
+        current_board = await asyncio.to_thread(self.get_board_state) or chess.Board()
+        self._game_id = object()
+        self._san_log = []
+        self._san_log_start = (current_board.fullmove_number, current_board.turn)
+        
+        # Only a position read from the page needs its own check; after that the
+        # outcome is worked out once per move, when the move is chosen
+        outcome = current_board.outcome(claim_draw=False)
         
         self.logger.info(f"Starting game with maximum {max_moves} moves...")
         
-        while moves_played < max_moves:
+        while not outcome and moves_played < max_moves:
             try:
-                # Check if game is over
-                if current_board.is_game_over():
-                    result = current_board.result()
-                    if result == "1-0":
-                        self.logger.info("Game Over: White wins!")
-                    elif result == "0-1":
-                        self.logger.info("Game Over: Black wins!")
-                    elif result == "1/2-1/2":
-                        self.logger.info("Game Over: Draw!")
-                    else:
-                        self.logger.info(f"Game Over: {result}")
-                    break
-                
-                # Reset failure counter on successful iteration start
-                consecutive_failures = 0
-                
                 # Show current position info
                 turn = "White" if current_board.turn else "Black"
                 self.logger.info(f"Move {moves_played + 1}: {turn} to play")
                 
                 # Calculate best move
-                best_move = self.calculate_best_move(current_board, time_limit=2.0)
+                best_move = await self.calculate_best_move(current_board, time_limit=2.0)
                 if not best_move:
                     self.logger.error("Could not calculate move, skipping turn")
-                    time.sleep(5)
+                    consecutive_failures += 1
+                    if consecutive_failures >= max_failures:
+                        self.logger.error("Too many move calculation failures, stopping")
+                        break
+                    await asyncio.sleep(self._backoff_delay(consecutive_failures))
                     continue
                 
-                # Execute the move
-                if self.execute_move(best_move):
-                    moves_played += 1
+                # Ponder the resulting position while the browser plays the move;
+                # the game can only end on a move, so check it here just once.
+                # This is the only copy per move: next_board is never changed
+                # after this, and becomes current_board once the move is played
+                next_board = current_board.copy()
+                next_board.push(best_move)
+                next_outcome = next_board.outcome(claim_draw=False)
+                if not next_outcome:
+                    self.start_ponder(next_board, time_limit=2.0)
+                
+                # Execute the move; Selenium blocks, so it runs off the event loop
+                await self._pace_move()
+                self._last_move_t = time.monotonic()
+                executed = await asyncio.to_thread(self.execute_move, best_move)
+                if executed:
+                    # Get the move in standard algebraic notation before pushing it
+                    try:
+                        san_move = current_board.san(best_move)
+                    except Exception:
+                        san_move = None
                     
                     # Update our internal board state
-                    current_board.push(best_move)
+                    current_board = next_board
+                    outcome = next_outcome
+                    moves_played += 1
+                    consecutive_failures = 0
+                    self._san_log.append(san_move or best_move.uci())
                     
                     # Log move in algebraic notation
-                    try:
-                        # Get the move in standard algebraic notation
-                        temp_board = current_board.copy()
-                        temp_board.pop()  # Remove the move we just made
-                        san_move = temp_board.san(best_move)
+                    if san_move:
                         self.logger.info(f"Successfully played move {moves_played}: {san_move} ({best_move})")
-                    except:
+                    else:
                         self.logger.info(f"Successfully played move {moves_played}: {best_move}")
                     
                     # Show some position info occasionally
                     if moves_played % 10 == 0:
-                        self.logger.info(f"Position after {moves_played} moves: {current_board.fen()}")
-                        
+                        self.logger.info(f"Last moves after {moves_played}: {' '.join(self._san_log[-10:])}")
+                    
                 else:
+                    # The ponder search is left running: the retry plays the same move
                     self.logger.error("Move execution failed, retrying...")
                     consecutive_failures += 1
                     if consecutive_failures >= max_failures:
                         self.logger.error("Too many move execution failures, stopping")
                         break
-                    time.sleep(2)
+                    await asyncio.sleep(self._backoff_delay(consecutive_failures))
                     continue
                 
-                # Wait before next move (shorter for faster play)
-                time.sleep(random.uniform(2, 4))
+                # The move handlers already waited for the move list to update,
+                # so just yield to other bots before the next move
+                await asyncio.sleep(0)
                 
             except KeyboardInterrupt:
                 self.logger.info("Game loop interrupted by user")
                 break
             except Exception as e:
-                self.logger.error(f"Error in game loop: {str(e)}")
+                self.logger.error(f"Error in game loop: {str(e)} (position: {current_board.fen()})")
                 consecutive_failures += 1
                 if consecutive_failures >= max_failures:
                     break
-                time.sleep(5)
+                await asyncio.sleep(self._backoff_delay(consecutive_failures))
+        
+        if outcome:
+            result = outcome.result()
+            if result == "1-0":
+                self.logger.info("Game Over: White wins!")
+            elif result == "0-1":
+                self.logger.info("Game Over: Black wins!")
+            elif result == "1/2-1/2":
+                self.logger.info("Game Over: Draw!")
+            else:
+                self.logger.info(f"Game Over: {result}")
         
         # Final game summary
         if moves_played > 0:
             self.logger.info(f"Game completed with {moves_played} moves played")
-            self.logger.info(f"Final position: {current_board.fen()}")
+            self.logger.info(f"Moves: {self.format_movetext()}")
         else:
             self.logger.info("No moves were played")
     
     def cleanup(self) -> None:
         """Clean up resources."""
         try:
+            self._cancel_idle_timer()
+            self.cancel_ponder()
+            self.save_move_cache()
             if self.engine:
-                self.engine.quit()
-                self.logger.info("Stockfish engine closed")
+                # The processes stay warm for the next bot; they are quit when the session ends
+                _IDLE_ENGINES.append((self.stockfish_path, self.engine, self.ponder_engine))
+                self.engine = None
+                self.ponder_engine = None
+                self.logger.info("Stockfish engine released")
             
             if self.driver:
                 self.driver.quit()
+                self.driver = None
+                self._actions = None
                 self.logger.info("Browser closed")
             
+            if self._book:
+                self._book.close()
+                self._book = None
+            
             if self.log_moves:
                 self.save_move_log()
                 
         except Exception as e:
             self.logger.error(f"Cleanup error: {str(e)}")
     
-    def run(self, username: str, password: str, max_moves: int = 50) -> None:
-        """Main run method to execute the bot."""
+    async def startup(self, username: str, password: str) -> None:
+        """Start the browser and engine, log in and open the analysis board."""
+        # Browser work blocks, so it runs in a thread while the engine starts;
+        # both are awaited before any failure is raised so cleanup sees them
+        results = await asyncio.gather(
+            asyncio.to_thread(self.setup_browser),
+            self.setup_engine(),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        
+        if not await asyncio.to_thread(self.login, username, password):
+            raise Exception("Login failed")
+        
+        if not await asyncio.to_thread(self.navigate_to_analysis_board):
+            raise Exception("Failed to navigate to analysis board")
+    
+    async def play_one_game(self, max_moves: int = 100) -> None:
+        """Play a single game on the already opened analysis board."""
+        self.logger.info("Starting game loop...")
+        await self.play_game_loop(max_moves)
+    
+    def _is_board_reset(self) -> bool:
+        """True once the move list is empty and the board shows the starting position."""
+        state = self._read_board_state()
+        if state.get('moves'):
+            return False
+        
+        fen = state.get('fen')
+        return not fen or fen.split()[0] == chess.STARTING_BOARD_FEN
+    
+    def reset_board(self) -> bool:
+        """Reset the analysis board to the starting position for the next game."""
         try:
-            self.setup_browser()
-            self.setup_engine()
+            # Start the next move log file with the next game
+            if self.log_moves:
+                self.save_move_log()
             
-            if not self.login(username, password):
-                raise Exception("Login failed")
+            selector = self.driver.execute_script(self.CLICK_FIRST_VISIBLE_JS, list(self.NEW_GAME_SELECTORS))
+            if selector:
+                # The next game reads the page right away, so make sure it no
+                # longer shows the last game's final position
+                try:
+                    WebDriverWait(self.driver, self.RESET_TIMEOUT, poll_frequency=self.WAIT_POLL_FREQUENCY).until(
+                        lambda driver: self._is_board_reset()
+                    )
+                    self.logger.info(f"Started new game with selector: {selector}")
+                    return True
+                except TimeoutException:
+                    self.logger.warning(f"Board did not reset after clicking {selector}, reloading")
             
-            if not self.navigate_to_analysis_board():
-                raise Exception("Failed to navigate to analysis board")
+            # No reset control found, or it did not reset the board; reloading is
+            # still far cheaper than a new browser, engine and login
+            return self.navigate_to_analysis_board(reload=True)
             
-            self.logger.info("Starting game loop...")
-            self.play_game_loop(max_moves)
+        except Exception as e:
+            self.logger.error(f"Failed to start a new game: {str(e)}")
+            return False
+    
+    async def new_game(self) -> bool:
+        """Prepare the running session for another game."""
+        # The engine sees a new game key on the next search and gets ucinewgame
+        return await asyncio.to_thread(self.reset_board)
+    
+    async def run(self, username: str, password: str, max_moves: int = 50) -> None:
+        """Main run method to execute the bot."""
+        try:
+            await self.startup(username, password)
+            await self.play_one_game(max_moves)
             
         except Exception as e:
             self.logger.error(f"Bot execution failed: {str(e)}")
         finally:
             self.cleanup()
 
+def probe_stockfish(stockfish_path: str) -> Optional[str]:
+    """
+    Check that the engine binary exists and answers the UCI handshake.
+    
+    Args:
+        stockfish_path (str): Path or command name of the engine
+        
+    Returns:
+        Optional[str]: Resolved path of a working engine, or None
+    """
+    path = shutil.which(stockfish_path) or stockfish_path
+    if not (os.path.isfile(path) and os.access(path, os.X_OK)):
+        return None
+    
+    try:
+        result = subprocess.run([path], input=b"uci\nquit\n", capture_output=True, timeout=2)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    
+    return path if b"uciok" in result.stdout else None
+
+async def ask_yes_no(prompt: str) -> bool:
+    """Prompt on stdin without blocking the event loop."""
+    response = await asyncio.get_running_loop().run_in_executor(None, input, prompt)
+    return response.strip().lower() in {'y', 'yes'}
+
+async def play_session(bots: List[ChessComBot], username: str, password: str,
+                       max_moves: int, continuous_play: bool, auto_continue: bool = False,
+                       max_games: Optional[int] = None) -> None:
+    """Play one game per bot concurrently, repeating while continuous play is on."""
+    # The event loop drives python-chess and Selenium; keep it off the engine
+    # cores. Executor threads started from here inherit the same cores.
+    _set_affinity(0, BROWSER_CORES)
+    try:
+        if continuous_play:
+            # Start each browser and engine once and reuse them for every game
+            try:
+                # Let every startup settle before raising, so cleanup sees
+                # every browser and engine that was started
+                results = await asyncio.gather(
+                    *(bot.startup(username, password) for bot in bots),
+                    return_exceptions=True
+                )
+                for result in results:
+                    if isinstance(result, BaseException):
+                        raise result
+                
+                # Play multiple games
+                game_count = 0
+                while True:
+                    game_count += 1
+                    print(f"\n=== Starting Game {game_count} ===")
+                    try:
+                        await asyncio.gather(*(bot.play_one_game(max_moves) for bot in bots))
+                        print(f"Game {game_count} completed")
+                        prompt = "Play another game? (y/n): "
+                        
+                    except Exception as e:
+                        print(f"Game {game_count} failed: {str(e)}")
+                        prompt = "Try another game? (y/n): "
+                    
+                    if max_games and game_count >= max_games:
+                        print(f"Reached the limit of {max_games} games")
+                        break
+                    
+                    # Ask if user wants to continue, unless running unattended
+                    if not auto_continue and not await ask_yes_no(prompt):
+                        break
+                    
+                    # Reset for next game
+                    await asyncio.gather(*(bot.new_game() for bot in bots))
+            finally:
+                for bot in bots:
+                    bot.cleanup()
+        else:
+            # Play single game
+            await asyncio.gather(*(bot.run(username, password, max_moves) for bot in bots))
+    finally:
+        await shutdown_engines()
+
 def main():
     """Main function to run the Chess.com bot."""
     # CONFIGURATION - Update these paths and credentials
     STOCKFISH_PATH = "/usr/bin/stockfish"
     CHESS_COM_USERNAME = "ur mail"
     CHESS_COM_PASSWORD = "ur pass"
+    BOOK_PATH = None  # Optional Polyglot opening book (.bin)
     
     # Bot settings
-    HEADLESS_MODE = False
     LOG_MOVES = True
     MAX_MOVES = 100  # Play a full game (50 moves per side)
-    CONTINUOUS_PLAY = False  # Set to True for unlimited games
+    CONTINUOUS_PLAY = False  # Set to True for several games in a row (see MAX_GAMES)
+    HEADLESS_MODE = CONTINUOUS_PLAY or bool(os.environ.get("CI"))  # No window for unattended runs
+    PARALLEL_GAMES = 1  # Number of bots playing side by side
+    MIN_MOVE_INTERVAL = 1.0  # Minimum seconds between move submissions
+    AUTO_CONTINUE = True  # Start the next game without asking
+    MAX_GAMES = 10  # Stop continuous play after this many games (None for no limit)
     
-    # Validate Stockfish path
-    if not os.path.exists(STOCKFISH_PATH):
-        print(f"Error: Stockfish not found at {STOCKFISH_PATH}")
+    # Validate Stockfish before paying for browser startup and login
+    stockfish_path = probe_stockfish(STOCKFISH_PATH)
+    if not stockfish_path:
+        print(f"Error: no working Stockfish found at {STOCKFISH_PATH}")
         print("Please download Stockfish from https://stockfishchess.org/download/")
         print("and update the STOCKFISH_PATH variable with the correct path.")
         return
     
-    # Initialize bot
-    bot = ChessComBot(
-        stockfish_path=STOCKFISH_PATH,
-        headless=HEADLESS_MODE,
-        log_moves=LOG_MOVES
-    )
+    # Initialize bots
+    bots = [
+        ChessComBot(
+            stockfish_path=stockfish_path,
+            headless=HEADLESS_MODE,
+            log_moves=LOG_MOVES,
+            book_path=BOOK_PATH,
+            min_move_interval=MIN_MOVE_INTERVAL
+        )
+        for _ in range(PARALLEL_GAMES)
+    ]
     
     try:
-        if CONTINUOUS_PLAY:
-            # Play multiple games
-            game_count = 0
-            while True:
-                game_count += 1
-                print(f"\n=== Starting Game {game_count} ===")
-                try:
-                    bot.run(CHESS_COM_USERNAME, CHESS_COM_PASSWORD, MAX_MOVES)
-                    print(f"Game {game_count} completed")
-                    
-                    # Ask if user wants to continue
-                    response = input("Play another game? (y/n): ").lower()
-                    if response != 'y' and response != 'yes':
-                        break
-                        
-                    # Reset for next game
-                    time.sleep(2)
-                    
-                except KeyboardInterrupt:
-                    print(f"\nStopped during game {game_count}")
-                    break
-                except Exception as e:
-                    print(f"Game {game_count} failed: {str(e)}")
-                    response = input("Try another game? (y/n): ").lower()
-                    if response != 'y' and response != 'yes':
-                        break
-        else:
-            # Play single game
-            bot.run(CHESS_COM_USERNAME, CHESS_COM_PASSWORD, MAX_MOVES)
-            
+        asyncio.run(play_session(
+            bots, CHESS_COM_USERNAME, CHESS_COM_PASSWORD, MAX_MOVES, CONTINUOUS_PLAY,
+            auto_continue=AUTO_CONTINUE, max_games=MAX_GAMES
+        ))
     except KeyboardInterrupt:
         print("\nBot stopped by user")
     except Exception as e: